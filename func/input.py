@@ -37,8 +37,25 @@ def get_input_data(input_files_from_args, transform_file_input_section, quiet=Fa
     # get spreadsheet sheet names (if any)
     transform_file_sheet_names = [input_file.get("sheets") for input_file in transform_file_input_section]
 
+    # get the fields to read from each input file (if any)
+    fields_to_read = [input_file.get("fields") for input_file in transform_file_input_section]
+
     # all of the above return lists in the same order as the input files so it can be easily accessed with the index, and if a value is not defined for a specific input file, the corresponding list element is None
 
+    # if fields are specified for an input file, only those columns are parsed (the names are the ones in the file, before any prefixing, suffixing or renaming)
+    usecols_per_file = [fields_to_read[index] if index < len(fields_to_read) else None for index in range(len(input_filenames))]
+
+    # when there are several CSV input files, they are parsed concurrently in background threads (the C parser releases the GIL while parsing)
+    # the results are picked up in the loop below, in the same order as before, so messages and error handling are unchanged
+    csv_executor = None
+    csv_futures = {}
+    csv_files_to_prefetch = [(index, input_filename) for index, input_filename in enumerate(input_filenames) if input_filename.endswith('.csv') and os.path.isfile(input_filename)]
+    if len(csv_files_to_prefetch) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+        csv_executor = ThreadPoolExecutor(max_workers=min(8, len(csv_files_to_prefetch)))
+        for index, input_filename in csv_files_to_prefetch:
+            csv_futures[index] = csv_executor.submit(pd.read_csv, input_filename, usecols=usecols_per_file[index])
+
     # read input
     input_data = {}
     input_file_metadata = {}
@@ -99,10 +116,18 @@ def get_input_data(input_files_from_args, transform_file_input_section, quiet=Fa
         if metadata_loaded:
             print()
 
+        usecols = usecols_per_file[index]
+
         # determine what type of file we are reading
         if input_filename.endswith('.csv'):
             # to make loading a csv compatible with loading a multi sheet spreadsheet, we load it into a dictionary with a single key 'csv'
-            tmp_data = {"csv": pd.read_csv(input_filename)}
+            try:
+                tmp_data = {"csv": csv_futures[index].result() if index in csv_futures else pd.read_csv(input_filename, usecols=usecols)}
+            except ValueError as e:
+                if not usecols:
+                    raise
+                print(f"ERROR:\nCould not read the fields {usecols} from input file '{input_filename}':\n{e}\n- exiting...")
+                sys.exit(1)
             # TODO: support custom data_entry names for CSV files to replace "csv"
         # check if input file is a spreadsheet ('.ods', '.xlsx', '.xls')
         elif input_filename.endswith('.ods') or input_filename.endswith('.xlsx') or input_filename.endswith('.xls'):
@@ -155,7 +180,13 @@ def get_input_data(input_files_from_args, transform_file_input_section, quiet=Fa
                     if not actual_sheet_name:
                         print(f"ERROR:\nSheet '{sheet_name}' not found in spreadsheet - exiting...")
                         sys.exit(1)
-                    tmp_data[rename_to_sheet_name or actual_sheet_name] = pd.read_excel(input_filename, sheet_name=actual_sheet_name)
+                    try:
+                        tmp_data[rename_to_sheet_name or actual_sheet_name] = pd.read_excel(input_filename, sheet_name=actual_sheet_name, usecols=usecols)
+                    except ValueError as e:
+                        if not usecols:
+                            raise
+                        print(f"ERROR:\nCould not read the fields {usecols} from sheet '{actual_sheet_name}' in input file '{input_filename}':\n{e}\n- exiting...")
+                        sys.exit(1)
                     # if sheet-name from input[].sheets list contains a dictionary, the key is the sheet name in the spreadsheet (or a template with placeholder), and the value is the name we want to use for the sheet when passing to the transform function
         else:
             print(f"ERROR:\nUnsupported input file type: {input_filename} - exiting...")
@@ -184,19 +215,25 @@ def get_input_data(input_files_from_args, transform_file_input_section, quiet=Fa
             # add entries so that the lists are the same length as the number of input files
             # loop through all sheets in the spreadsheet and do renaming, prefixing, suffixing:
             for sheet_name, sheet_data in tmp_data.items():
+                # prefixing, suffixing and renaming are composed on the column labels only,
+                # and the dataframe is relabeled once at the end (instead of once per step)
+                columns = sheet_data.columns
                 # add prefix to field names if defined in transform file and the field name exists
-                if field_prefix and sheet_data.columns.isin([field_prefix]).any():
+                if field_prefix and columns.isin([field_prefix]).any():
                     print(f"Adding prefix '{field_prefix}_' to field names in data entry '{sheet_name}'")
-                    sheet_data = sheet_data.add_prefix(field_prefix+'_')
-                if field_suffix and sheet_data.columns.isin([field_suffix]).any():
+                    columns = pd.Index([f"{field_prefix}_{column}" for column in columns])
+                if field_suffix and columns.isin([field_suffix]).any():
                     print(f"Adding suffix '_{field_suffix}' to field names in data entry '{sheet_name}'")
-                    sheet_data = sheet_data.add_suffix('_'+field_suffix)
-                if rename_field and any(key in sheet_data.columns for key in rename_field.keys()):
+                    columns = pd.Index([f"{column}_{field_suffix}" for column in columns])
+                if rename_field and any(key in columns for key in rename_field.keys()):
                     for from_field, to_field in rename_field.items():
                         print(f"Renaming column '{from_field}' in data entry '{sheet_name}' to '{to_field}'")
-                        # if any of the fields to rename to already exists, drop it
-                        #sheet_data = sheet_data.drop(columns=list(rename_field.values()), errors='ignore')
-                        sheet_data.rename(columns={from_field: to_field}, inplace=True)
+                    # if any of the fields to rename to already exists, drop it
+                    #sheet_data = sheet_data.drop(columns=list(rename_field.values()), errors='ignore')
+                    # rename all fields in one go
+                    columns = pd.Index([rename_field.get(column, column) for column in columns])
+                if columns is not sheet_data.columns:
+                    sheet_data.columns = columns
                 tmp_data[sheet_name] = sheet_data
                 # TODO: this renaming is now done across all sheets, but it should be done per sheet, if we had a way to specify which sheet the renaming applies to.
                 # this could for example be by specifying the renaming under the sheet name in the json transform file, like this:
@@ -221,6 +258,9 @@ def get_input_data(input_files_from_args, transform_file_input_section, quiet=Fa
 
     # end of: for index, input_filename in enumerate(input_filenames, start=0):
 
+    if csv_executor:
+        csv_executor.shutdown()
+
     # check metadata for actions that should be performed on the input data
     input_data = process_input_metadata(input_data, input_file_metadata)
 
@@ -2,7 +2,6 @@ import os
 import sys
 import inspect
 import pandas as pd
-from tabulate import tabulate
 
 def get_filenames(
         files_from_args, 
@@ -83,6 +82,9 @@ def get_filenames(
             print_help = True
 
     files_from_args_list = files_from_args.split(',') if files_from_args else []
+    # replace empty string, space(s) or placeholder _ with None - filename from transform file will be used instead
+    # (done once here, so the loop below can just zip the names with the nodes in the transform file)
+    filenames_from_command_line = [None if filename.strip(' ') in ['', '_'] else filename for filename in files_from_args_list]
     
     # make sure that the number of filenames defined in the transform file matches or exceeds the number of filenames given on the command line
     if files_from_args:
@@ -98,7 +100,10 @@ def get_filenames(
                 for i in range(number_of_files_from_args - number_of_files_from_transform_file):
                     files_from_transform_file.append({})
 
-    for index, file_from_transform_file in enumerate(files_from_transform_file, start=0):
+    # pad the command line file names with None, so there is one for each node in the transform file
+    filenames_from_command_line += [None] * (len(files_from_transform_file) - len(filenames_from_command_line))
+
+    for index, (file_from_transform_file, filename_from_command_line) in enumerate(zip(files_from_transform_file, filenames_from_command_line), start=0):
         if file_type == 'graph':
             filename_from_transform_file = None
             input_section_from_transform_file = file_from_transform_file.get('input')
@@ -106,13 +111,6 @@ def get_filenames(
                 filename_from_transform_file = input_section_from_transform_file.get('filename')
         else:
             filename_from_transform_file = file_from_transform_file.get('filename')
-        if index < len(files_from_args_list):
-            filename_from_command_line = files_from_args_list[index]
-            # replace empty string, space(s) or placeholder _ with None - filename from transform file will be used instead
-            if filename_from_command_line.strip(' ') in ['', '_']:
-                filename_from_command_line = None
-        else:
-            filename_from_command_line = None
         
         # assemble list of file names for error message
         filenames_for_error_message.append([index + 1, filename_from_command_line, filename_from_transform_file])
@@ -123,22 +121,23 @@ def get_filenames(
             filename_help += f"File name not defined for {file_type} #{index + 1}.\n"
             print_help = True
 
-    filename_help += \
-    f"\nThe {file_type} filename(s) can be defined as a command line argument --{file_type} (comma separated list if more than one) or in the {file_type} section in the transform file (as a filename attribute under each {file_type} node).\n" + \
-    f"File names specified on the command line takes precedence over file names defined in the transform file.\n" + \
-    f"A single underscore (or nothing) can be used as a placeholder for a filename on the command line if the filename is defined in the transform file and you don't want to override it with a command line argument, but you want to override another file.\n" + \
-    f"example: --{file_type}=_,_,3rdfile.csv\n" + \
-    f"(here the 1st and 2nd filename will be from the transform file and the 3rd from the command line)\n\n" + \
-    f"The following {file_type} files were specified:\n"
-
-    # format table for error message
-    tabulate(filenames_for_error_message, headers=["#", "Command line argument", "Transform file"], tablefmt="psql", showindex=False)
-
     if not filenames:
         print(f"ERROR:\nNo {file_type} file names defined.")
         print_help = True
     
+    # the help text (and the table of file names) is only assembled when it is going to be printed
     if print_help:
+        filename_help += \
+        f"\nThe {file_type} filename(s) can be defined as a command line argument --{file_type} (comma separated list if more than one) or in the {file_type} section in the transform file (as a filename attribute under each {file_type} node).\n" + \
+        f"File names specified on the command line takes precedence over file names defined in the transform file.\n" + \
+        f"A single underscore (or nothing) can be used as a placeholder for a filename on the command line if the filename is defined in the transform file and you don't want to override it with a command line argument, but you want to override another file.\n" + \
+        f"example: --{file_type}=_,_,3rdfile.csv\n" + \
+        f"(here the 1st and 2nd filename will be from the transform file and the 3rd from the command line)\n\n" + \
+        f"The following {file_type} files were specified:\n"
+
+        # format table for error message
+        from tabulate import tabulate
+        filename_help += tabulate(filenames_for_error_message, headers=["#", "Command line argument", "Transform file"], tablefmt="psql", showindex=False) + "\n"
         print(filename_help)
 
     if not quiet:
@@ -210,18 +209,11 @@ def get_node_attributes(transform_file, node_name, attribute_name, default=None)
         Returns:
             ['split_name', 'split_address']
     """
-    try:
-        nodes = transform_file[node_name]
-    except KeyError:
-        nodes = []
-    
+    nodes = transform_file.get(node_name) or []
+
     attributes = []
     for node in nodes:
-        try:
-            attribute = node[attribute_name]
-        except KeyError:
-            attribute = default
-        attributes.append(attribute)
+        attributes.append(node.get(attribute_name, default))
     return attributes
 
 def replace_placeholders(user_string, variable_substitutions):
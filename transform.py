@@ -1,29 +1,37 @@
-import pandas as pd
 import json
+import csv
 import argparse
 import importlib
 import sys
 
-from func.shared import get_filenames, print_data_summary, check_data_source_and_entry, split_data_and_metadata, process_metadata, data_is_empty
-from func.input import get_input_data
+def load_transform_file(transform_filename):
+    # read the whole transform file with a single unbuffered read and parse the bytes directly
+    # orjson is used for parsing if it is installed, as it is considerably faster than the json module in the standard library
+    try:
+        from orjson import loads as json_loads
+    except ImportError:
+        json_loads = json.loads
+    with open(transform_filename, 'rb', buffering=0) as transform_file_wrapper:
+        return json_loads(transform_file_wrapper.read())
 
 def main():
     parser = argparse.ArgumentParser(description='Data Transformation')
     parser.add_argument('--input', help='Input CSV file(s), if not defined in transform file', required=False)
-    parser.add_argument('--output', help='Output CSV file(s), if not defined in transform file', required=False)
+    parser.add_argument('--output', help='Output CSV (or .parquet/.arrow) file(s), if not defined in transform file', required=False)
     parser.add_argument('--graph', '--graphs', help='Output SVG/PNG file(s), overides filename defined in transform file', required=False)
     parser.add_argument('--transform', help='Transform file in JSON format', required=True)
     parser.add_argument('--quiet', '-q', help='Suppress output', action='store_true')
     args = parser.parse_args()
 
-    with open(args.transform, 'r') as transform_file_wrapper:
-        transform_file = json.load(transform_file_wrapper)
+    # pandas (and the modules using it) are imported after the command line has been parsed, so --help and argument errors respond quickly
+    import pandas as pd
+    from func.shared import get_filenames, print_data_summary, check_data_source_and_entry, split_data_and_metadata, process_metadata, data_is_empty
+    from func.input import get_input_data
+
+    transform_file = load_transform_file(args.transform)
 
     # import modules needed for transformations
-    try:
-        modules_and_functions = transform_file['import']
-    except KeyError:
-        modules_and_functions = []
+    modules_and_functions = transform_file.get('import') or []
     
     transform_functions = {}
     for module_and_function in modules_and_functions:
@@ -51,48 +59,40 @@ def main():
     )
 
     # transform data
-    # output_data = pd.DataFrame()
-    transformations = transform_file.get('transformations')
-
-    # # if input data is a dataframe, this means we're dealing with a single sheet or csv file, that could be combined with others (if multiple input files are specified)
-    # if isinstance(input_data, pd.DataFrame):
-    #     # add an index column to the input data so that it can be combined with the transformed data
-    #     input_data['__index__'] = input_data.index
-    # # copy input data to output data
-    
-    # assign input data to output data so that we can keep passing output_data to the next transformation function
-    # output_data = input_data
+    # the data dict is passed from one transformation function to the next, each adding its own data source,
+    # so the dataframes keep their own pandas index and no extra index column is needed to combine them
+    transformations = transform_file.get('transformations') or []
+
+    # resolve the transform function, input and output sections for each transformation once, before any of them are executed
+    # Take input and output fields from transform file and use them as arguments to the transformation function
+    # This makes it possible to define all field names for both input and output files in the transform file
+    transformation_plan = [
+        (transformation['function'], transform_functions.get(transformation['function']), transformation.get('input') or [], transformation.get('output') or [])
+        for transformation in transformations
+    ]
+    missing_functions = [function_name for function_name, transform_function, _, _ in transformation_plan if transform_function is None]
+    if missing_functions:
+        available_functions = '\n'.join(transform_functions.keys())
+        print(f"ERROR:\n"\
+        f"Transform function(s) {missing_functions} not defined.\n"\
+        f"You can define them by adding them in the import section of '{args.transform}'.\n"\
+        f"These functions are then used in the transformations section.\n"\
+        f"Currently, the following functions have been defined:\n{available_functions}\n")
+        sys.exit(1)
 
-    transformations = transformations or []
     # go through each transformation defined in the transform file (json) and apply the result to the output data
-    for index, transformation in enumerate(transformations, start=1):
-        # Take input and output fields from transform file and use them as arguments to the transformation function
-        # This makes it possible to define all field names for both input and output files in the transform file
-        input_section = transformation.get('input') or []
-        output_section = transformation.get('output') or []
-
-        if transformation['function'] in transform_functions:
-            transform_function = transform_functions[transformation['function']]
-        else:
-            available_functions = '\n'.join(transform_functions.keys())
-            print(f"ERROR:\n"\
-            f"Transform function '{transformation['function']}' is not defined.\n"\
-            f"You can define it by adding it in the import section of '{args.transform}'.\n"\
-            f"These functions are then used in the transformations section.\n"\
-            f"Currently, the following functions have been defined:\n{available_functions}\n")
-            sys.exit(1)
-
+    for index, (function_name, transform_function, input_section, output_section) in enumerate(transformation_plan, start=1):
         # apply transform function to data to procude updated data
-        print(f"Executing transform function #{index} ({transformation['function']}):")
+        print(f"Executing transform function #{index} ({function_name}):")
         data, legacy_metadata_dont_use = transform_function(data, input_section, output_section)
 
         # check for legacy_metadata_dont_use returned by transform function
         if legacy_metadata_dont_use:
             if not args.quiet:
-                print(f"legacy_metadata returned by transform function #{index} ({transformation['function']}): {legacy_metadata_dont_use}")
+                print(f"legacy_metadata returned by transform function #{index} ({function_name}): {legacy_metadata_dont_use}")
 
         if not args.quiet:
-            print(f"\nOutput fields produced by transform function #{index} ({transformation['function']}):")
+            print(f"\nOutput fields produced by transform function #{index} ({function_name}):")
             print_data_summary(data)
 
     if len(transformations) == 0:
@@ -141,8 +141,8 @@ def main():
         #         "fields": ["name", "first_name", "last_name", "address", "address_street", "address_house_number", "address_suffix", "postal_code", "city"]
         #     }
         # write output file(s)
+        output_data, output_metadata = split_data_and_metadata(data)
         for index, output_node in enumerate(output_section, start=0):
-            output_data, output_metadata = split_data_and_metadata(data)
             output_node = check_data_source_and_entry(output_data, output_node, section=f"output")
 
             data_source = output_node['data_source']
@@ -156,28 +156,41 @@ def main():
             # for CSV files it is "csv" by default
             # for spreadsheet files it is the name of the sheet
             # for transformations it is whatever name the transformation function gives it, typically just "data"
+            data_from_output_data_entry = output_data[data_source][data_entry]
 
             # if any of the output fields are "*", find all fields not specified in output_fields and add them to the output
             if '*' in output_fields:
-                # make a list of fields to add to the output
-                fields_to_add = []
-                for field in output_data.get(data_source).get(data_entry).columns:
-                    if field not in output_fields:
-                        fields_to_add.append(field)
-                # replace '*' with fields_to_add, in the position where '*' was 
+                # make a list of fields to add to the output (set difference on the column index, keeping the column order)
+                fields_to_add = data_from_output_data_entry.columns.difference(output_fields, sort=False).tolist()
+                # replace '*' with fields_to_add, in the position where '*' was, and delete any subsequent '*' in the list
                 index_of_asterisk = output_fields.index('*')
-                output_fields = output_fields[:index_of_asterisk] + fields_to_add + output_fields[index_of_asterisk + 1:]
-                # delete any subsequent '*' in the list
-                while '*' in output_fields:
-                    index_of_asterisk = output_fields.index('*')
-                    output_fields = output_fields[:index_of_asterisk] + output_fields[index_of_asterisk + 1:]
-                    if not args.quiet:
+                fields_after_asterisk = output_fields[index_of_asterisk + 1:]
+                if not args.quiet:
+                    for _ in range(fields_after_asterisk.count('*')):
                         print(f"Warning: multiple instances of '*' found in output fields for output file #{index + 1}. Only the first instance will be used.")
+                output_fields = output_fields[:index_of_asterisk] + fields_to_add + [field for field in fields_after_asterisk if field != '*']
             output_filename = output_filenames[index]
-            data_from_output_data_entry = output_data.get(data_source).get(data_entry)
             if not args.quiet:
                 print(f"Writing '{data_source}'/'{data_entry}' to output file #{index + 1} -- {len(data_from_output_data_entry)} rows\n  Columns: {list(output_fields)}")
-            data_from_output_data_entry.to_csv(output_filename, columns=output_fields, index=False)
+            # the output format is decided by the file extension: .parquet and .arrow/.feather are written as binary columnar files (requires pyarrow), anything else as CSV
+            output_file_extension = output_filename.rsplit('.', 1)[-1].lower()
+            if output_file_extension in ['parquet', 'arrow', 'feather']:
+                try:
+                    import pyarrow
+                    import pyarrow.parquet
+                    import pyarrow.feather
+                except ImportError:
+                    print(f"ERROR:\nWriting .{output_file_extension} files requires the pyarrow package (pip install pyarrow) -- could not write output file #{index + 1}: {output_filename}")
+                    sys.exit(1)
+                output_table = pyarrow.Table.from_pandas(data_from_output_data_entry[output_fields], preserve_index=False)
+                if output_file_extension == 'parquet':
+                    pyarrow.parquet.write_table(output_table, output_filename, compression='zstd')
+                else:
+                    pyarrow.feather.write_feather(output_table, output_filename)
+            else:
+                # the file name is passed to to_csv, so pandas infers compression from the extension (.gz, .zip, .bz2, .xz, ...)
+                # the rows are formatted in large chunks and always end with '\n', so no line ending translation is needed
+                data_from_output_data_entry.to_csv(output_filename, columns=output_fields, index=False, chunksize=200_000, lineterminator='\n', quoting=csv.QUOTE_MINIMAL)
 
         # Generate graphs, if any are defined in the transform file
         graphs = transform_file.get('graphs')
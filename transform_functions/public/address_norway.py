@@ -1,6 +1,42 @@
 import re
+import sys
 import pandas as pd
-from func.shared import check_data_source_and_entry, structure_dataframe
+from func.shared import verify_data, check_data_source_and_entry, split_data_and_metadata, structure_dataframe
+
+# the regular expressions used by split_address() are compiled once, when the module is loaded
+# (re.DOTALL is used so that . also matches a newline, should an address contain one)
+
+# everything before the last comma is street address, everything after is postal code and city
+# (the greedy .* makes the comma match the last comma in the address)
+LAST_COMMA_REGEX = re.compile(r'^(?P<street_address>.*),(?P<postal_code_city>.*)$', re.DOTALL)
+
+# street name, house number and suffix
+HOUSE_NUMBER_REGEX = re.compile(
+    r'^(?P<street>.*?)(?P<house_number>(?<=[a-zA-Z.] )(?:(?:\d+(?:\s?\w?))|(?:\d+(?:(?:-|\/)\d+))))(?=(?: [a-zA-Z] )?(?:$| |,))(?P<suffix>.*)$',
+    re.DOTALL
+)
+# regex explanation:
+
+# Everything before the house number:
+# ^(?P<street>.*?) - The street name: as few characters as possible from the start of the string, so the house number is the first possible match (like re.search would find it)
+# (?<=[a-zA-Z.] ) - Positive lookbehind assertion, matches a position that is preceded by a letter or a period, followed by a space. This prevents matching a number at the start of the street name like "7 Juni plassen" or "1884-trappen".
+
+# The house number(s):
+# (\d+(?:\s?\w?)) - Group that matches one or more digits, optionally followed by a single space and an optional word character. This will capture the house number with optional letter, such as "1", "100", "100a" and even 100 a", but not "100abc", as the latter is not a valid house number.
+# | or
+# (\d+(?:(-|\/)\d+)) - Group that matches one or more digits, followed by a hyphen or slash and one or more digits. This will capture addresses spanning multiple house numbers, such as "1-3", "10/12", "100-102", but not "100a-102b" or "100 a-102 b", or "100abc-102def", as the latter 3 are not valid house numbers. We assume that addresses spanning multiple house numbers do not have a letters, such as "a" or "b".
+
+# Everything after the house number:
+# (?=(?: [a-zA-Z] )?($| |,))   Positive lookahead assertion, matches a position that is followed by an optional space and a letter, which would indicate the beginning of optional extra info, such as apartment number, unit number or entrance, or the end of the string. Also treats a comma like a space for optional separation. It will thus handle both "Storgata 6 leilighet 3" and "Storgata 6, leilighet 3". Note that if the house number is separated from this suffix by a comma, the comma wil be included in the suffix, but split_address() strips that with .str.strip(", ").
+# (?P<suffix>.*)$ - The suffix: the rest of the string
+
+# postal code and city
+POSTAL_CODE_CITY_REGEX = re.compile(r'^(?P<postal_code>\d{4}|N-\d{4}) (?P<city>.*)$', re.DOTALL)
+# The regex will match valid norwegian postal codes, such as "4790" and "N-4790", followed by a space and the city
+# ^: Start of the string.
+# either: \d{4}:   Exactly 4 digits.
+# or:     N-\d{4}: Literal characters "N-" + exactly 4 digits.
+# (?P<city>.*)$: everything after the first space is the city
 
 def split_address(input_data, input_section, output_fields):
     """
@@ -15,14 +51,14 @@ def split_address(input_data, input_section, output_fields):
     and output DataFrame.
 
     Args:
-        input_data (pd.DataFrame): The input DataFrame containing the address data to be split.
-        input_fields (list): A list containing the name of the input field to be split.
+        input_data (dict): The structured data ({"data": ..., "metadata": ...}) containing the address data to be split.
+        input_section (dict): The data source, data entry and the name of the input field to be split (see below).
         output_fields (list): A list containing the names of the output fields for 
                              street name, house number, suffix, postal code, and city.
 
     Returns:
-        pd.DataFrame: A DataFrame with separate columns for street name, house number,
-                      suffix, postal code, and city.
+        The structured data, with a new data source 'split_address' (data entry 'data') with separate
+        columns for street name, house number, suffix, postal code, and city.
 
     Raises:
         Exception: If the length of input_fields is not exactly 1 or the length of
@@ -35,8 +71,12 @@ def split_address(input_data, input_section, output_fields):
             Parkveien 45, Seksjon 1, Inng.A, 1337 Sandvika
             Nedre Kirkegate 7B, 5005 Bergen
 
-        input_fields:
-            ['address']
+        input_section:
+            {
+                data_source: "input_1",
+                data_entry: "csv",
+                fields: ['address']
+            }
 
         output_fields:
             ['address_street', 'address_house_number', 'address_suffix', 'postal_code', 'city']
@@ -45,16 +85,16 @@ def split_address(input_data, input_section, output_fields):
             import pandas as pd
             import re
             from transform_functions.public.address_norway import split_address
-            input_data = pd.DataFrame({
+            input_data = {"data": {"input_1": {"csv": pd.DataFrame({
                 'address': [
                     'Storgata 6 leilighet 3, 0123 Oslo',
                     'Parkveien 45, Seksjon 1, Inng.A, 1337 Sandvika',
                     'Nedre Kirkegate 7B, 5005 Bergen'
                 ]
-            })
-            input_fields = ['address']
+            })}}, "metadata": {}}
+            input_section = {"fields": ['address']}
             output_fields = ['address_street', 'address_house_number', 'address_suffix', 'postal_code', 'city']
-            split_address(input_data, input_fields, output_fields)
+            split_address(input_data, input_section, output_fields)
 
         Returns:
             | address_street       | address_house_number | address_suffix    | postal_code | city     |
@@ -63,8 +103,10 @@ def split_address(input_data, input_section, output_fields):
             | Parkveien            | 45                   | Seksjon 1, Inng.A | 1337        | Sandvika |
             | Nedre Kirkegate      | 7B                   |                   | 5005        | Bergen   |
     """
-    NEEDS_RENEWAL
-    input_section = check_data_source_and_entry(input_data, input_section)
+    # ensure consistency of input data
+    existing_data, existing_metadata = split_data_and_metadata(verify_data(input_data))
+
+    input_section = check_data_source_and_entry(existing_data, input_section)
     if not input_section:
         print("Exiting...")
         sys.exit(1)
@@ -77,77 +119,47 @@ def split_address(input_data, input_section, output_fields):
         raise Exception(f"split_address() requires exactly one input field: address -- however, this was given: {input_fields}")
     if len(output_fields) != 5:
         raise Exception(f"split_address() requires exactly five output fields: address_street, address_house_number, address_suffix, postal_code, city -- however, this was given: {output_fields}")
-    output_data = pd.DataFrame()
-    address_streets = []
-    address_house_numbers = []
-    address_suffixes = []
-    postal_codes = []
-    cities = []
-    for _, row in input_data.get(data_source).get(data_entry).iterrows():
-        address_parts = row[input_fields[0]].split(',')
-        
-        if len(address_parts) > 1:
-            # everything after last comma is postal code and city
-            postal_code_city = address_parts.pop().strip()
-            # everything before last comma is street address
-            street_address = ','.join(address_parts).strip()
-
-            # Match house number
-            match = re.search(r'(?<=[a-zA-Z.] )((\d+(?:\s?\w?))|(\d+(?:(-|\/)\d+)))(?=(?: [a-zA-Z] )?($| |,))', street_address)
-            # regex explanation:
-            
-            # Everything before the house number:
-            # (?<=[a-zA-Z.] ) - Positive lookbehind assertion, matches a position that is preceded by a letter or a period, followed by a space. This prevents matching a number at the start of the street name like "7 Juni plassen" or "1884-trappen".
-
-            # The house number(s):
-            # (\d+(?:\s?\w?)) - Capturing group that matches one or more digits, optionally followed by a single space and an optional word character. This will capture the house number with optional letter, such as "1", "100", "100a" and even 100 a", but not "100abc", as the latter is not a valid house number.
-            # | or
-            # (\d+(?:(-|\/)\d+)) - Capturing group that matches one or more digits, followed by a hyphen or slash and one or more digits. This will capture addresses spanning multiple house numbers, such as "1-3", "10/12", "100-102", but not "100a-102b" or "100 a-102 b", or "100abc-102def", as the latter 3 are not valid house numbers. We assume that addresses spanning multiple house numbers do not have a letters, such as "a" or "b".
-
-            # Everything after the house number:
-            # (?=(?: [a-zA-Z] )?($| |,))   Positive lookahead assertion, matches a position that is followed by an optional space and a letter, which would indicate the beginning of optional extra info, such as apartment number, unit number or entrance, or the end of the string. Also treats a comma like a space for optional separation. It will thus handle both "Storgata 6 leilighet 3" and "Storgata 6, leilighet 3". Note that if the house number is separated from this suffix by a comma, the comma wil be included in the suffix, but we'll strip that below with .strip(", ").
-            
-            if match:
-                # split into street, house number and suffix
-                address_streets.append(street_address[:match.start()].strip())
-                address_house_numbers.append(match.group())
-                address_suffixes.append(street_address[match.end():].strip(", "))
-            else:
-                # no house number found: jam it all in street name as a last resort
-                address_streets.append(street_address)
-                address_house_numbers.append('')
-                address_suffixes.append('')
-            
-            # Split postal code and city
-            put_everything_in_city = True
-            if ' ' in postal_code_city:
-                postal_code, city = postal_code_city.split(' ', 1) # Split on first space
-                if re.match(r'^(?:\d{4}|N-\d{4})$', postal_code):
-                    # The regex will match valid norwegian postal codes, such as "4790" and "N-4790"
-                    # ^: Start of the string.
-                    # (?: ... ): A non-capturing group that contains two alternatives separated by a pipe |.
-                    # either: \d{4}:   Exactly 4 digits.
-                    # or:     N-\d{4}: Literal characters "N-" + exactly 4 digits.
-                    # $: End of the string.
-                    postal_codes.append(postal_code)
-                    cities.append(city)
-                    put_everything_in_city = False
-            
-            if put_everything_in_city:
-                postal_codes.append('')
-                cities.append(postal_code_city)
-        else:
-            address_streets.append(address_parts[0].strip())
-            address_house_numbers.append('')
-            address_suffixes.append('')
-            postal_codes.append('')
-            cities.append('')
+    # all rows are processed at once with vectorized string operations (the regex engine is run once per column instead of once per row in a python loop)
+    addresses = existing_data.get(data_source).get(data_entry)[input_fields[0]].fillna('').astype(str)
+
+    # split on the last comma: everything before the last comma is street address, everything after is postal code and city
+    address_parts = addresses.str.extract(LAST_COMMA_REGEX)
+    has_postal_code_city = address_parts['postal_code_city'].notna()
+    street_addresses = address_parts['street_address'].where(has_postal_code_city, addresses).str.strip()
+    postal_codes_and_cities = address_parts['postal_code_city'].str.strip()
+
+    # Match house number
+    # the street name is everything before the first house number match, and the suffix is everything after it
+    street_address_parts = street_addresses.str.extract(HOUSE_NUMBER_REGEX)
+
+    # addresses without a comma are put in the street name as they are, without looking for a house number
+    house_number_found = street_address_parts['house_number'].notna() & has_postal_code_city
+    # no house number found: jam it all in street name as a last resort
+    address_streets = street_address_parts['street'].str.strip().where(house_number_found, street_addresses)
+    address_house_numbers = street_address_parts['house_number'].where(house_number_found, '')
+    address_suffixes = street_address_parts['suffix'].str.strip(', ').where(house_number_found, '')
+
+    # Split postal code and city on the first space
+    postal_code_city_parts = postal_codes_and_cities.str.extract(POSTAL_CODE_CITY_REGEX)
+    postal_code_found = postal_code_city_parts['postal_code'].notna()
+    postal_codes = postal_code_city_parts['postal_code'].where(postal_code_found, '')
+    # if there's no valid postal code, put everything after the last comma in city
+    cities = postal_code_city_parts['city'].where(postal_code_found, postal_codes_and_cities.fillna(''))
 
+    output_data = pd.DataFrame()
     output_data[output_fields[0]] = address_streets
     output_data[output_fields[1]] = address_house_numbers
     output_data[output_fields[2]] = address_suffixes
     output_data[output_fields[3]] = postal_codes
     output_data[output_fields[4]] = cities
 
+    # store the output as pyarrow backed strings (one contiguous buffer per column instead of one python object per value), if pyarrow is installed
+    try:
+        import pyarrow
+        string_dtype = 'string[pyarrow]'
+    except ImportError:
+        string_dtype = 'string'
+    output_data = output_data.astype({output_field: string_dtype for output_field in output_fields[:5]})
+
     metadata = {} 
-    return structure_dataframe(output_data, input_data), metadata
+    return structure_dataframe(output_data, {}, input_data), metadata
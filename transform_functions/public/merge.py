@@ -1,5 +1,5 @@
 import pandas as pd
-from func.shared import structure_dataframe
+from func.shared import verify_data, split_data_and_metadata, structure_dataframe
 
 def merge_by_column(data, input_fields, output_fields):
 
@@ -24,17 +24,42 @@ def merge_by_column(data, input_fields, output_fields):
     # ]
     # The order in the numbering of data sources is the same as the order in which the files were specified in the transform file or command line argument.
 
+    # data is the structured data ({"data": ..., "metadata": ...}), the data sources described above are under the "data" key
+    existing_data, existing_metadata = split_data_and_metadata(verify_data(data))
+
     print("Merging data from all data sources and all data entries (sheets in spreadsheets)...")
-    # loop through the input data, file by file and merge them
-    merged_data = pd.DataFrame()
+    # loop through the input data, file by file, and collect the dataframes, so they can be merged in one go
+    frames = []
     #input_fields_per_file = []
-    for data_source, data_entry_dict in data.items():
+    for data_source, data_entry_dict in existing_data.items():
         # get the dataframe from the dictionary
         for data_entry, tmp_data in data_entry_dict.items():
             #input_fields_per_file.append(list(tmp_data.columns))
             print(f"Adding data from source '{data_source}' entry '{data_entry}' (cols: {len(tmp_data.columns)}, rows: {len(tmp_data)})")
-            # merge the dataframe with the output data
-            merged_data = merged_data.combine_first(tmp_data)
+            frames.append(tmp_data)
+
+    # stage the merged data column by column (a dict with column name as key and the column as value)
+    # new columns are just added to the dict, so only columns that exist in more than one dataframe need combine_first():
+    # the values from the first dataframe are kept, and missing values are filled in from the following dataframes
+    staged_columns = {}
+    for tmp_data in frames:
+        for column in tmp_data.columns:
+            if column in staged_columns:
+                staged_column = staged_columns[column]
+                new_column = tmp_data[column]
+                # if the staged column has the same rows and dtype and no missing values, there is nothing to fill in, so combine_first() is skipped
+                if staged_column.dtype == new_column.dtype and staged_column.index.equals(new_column.index) and not staged_column.hasnans:
+                    continue
+                staged_columns[column] = staged_column.combine_first(new_column)
+            else:
+                staged_columns[column] = tmp_data[column]
+
+    # build the merged dataframe in one go, aligning all columns on the index
+    merged_data = pd.DataFrame(staged_columns) if staged_columns else pd.DataFrame()
+
+    # the columns are sorted alphabetically, as the README documents that "*" in the output fields adds the remaining fields in alphabetical order
+    # (the original combine_first() loop gave that order on pandas < 3, but pandas 3 no longer sorts the columns of combine_first() results)
+    merged_data = merged_data.sort_index(axis=1)
 
     metadata = {} 
-    return structure_dataframe(merged_data, data), metadata
+    return structure_dataframe(merged_data, {}, data), metadata
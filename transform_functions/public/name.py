@@ -1,6 +1,22 @@
 import sys
 import pandas as pd
-from func.shared import check_data_source_and_entry, structure_dataframe
+from func.shared import verify_data, check_data_source_and_entry, split_data_and_metadata, structure_dataframe
+
+def split_one_name(name):
+    """
+    Split a single full name into (first_name, last_name), used by split_name().
+    """
+    # if name is "last_name, first_name"
+    if ',' in name:
+        last_name, first_name = name.split(',', 1)
+    # if name is "first_name last_name"
+    elif ' ' in name:
+        first_name, last_name = name.rsplit(' ', 1)
+    # if name is just "first_name"
+    else:
+        first_name = name
+        last_name = ''
+    return first_name.strip(), last_name.strip()
 
 def split_name(input_data, input_section, output_fields):
     """
@@ -11,13 +27,13 @@ def split_name(input_data, input_section, output_fields):
     to match the field names of the input and output DataFrame.
 
     Args:
-        input_data (pd.DataFrame): The input DataFrame containing the data to be split.
-        input_section (list or dict): (see below)
+        input_data (dict): The structured data ({"data": ..., "metadata": ...}) containing the data to be split.
+        input_section (dict): The data source, data entry and input field (see below)
         output_fields (list): A list containing the names of the output fields
                              where the first name and last name will be stored.
 
     Returns:
-        pd.DataFrame: A DataFrame with two new columns for first name and last name.
+        The structured data, with a new data source 'split_name' (data entry 'data') with two columns for first name and last name.
 
     Raises:
         Exception: If the length of input_fields is not exactly 1 or the length of
@@ -30,15 +46,13 @@ def split_name(input_data, input_section, output_fields):
             Jane H. Smith
             Johnson, Robert A.
 
-        input_fields:
-            ['name']
-            or
+        input_section:
             {
-                data_source: "input1",
+                data_source: "input_1",
                 data_entry: "csv",
                 fields: ["name"]
             }
-            note that supplying the fields as a list will only work if there is only one input file and that file is a CSV file or a spreadsheet with only one sheet
+            data_source and data_entry can be left out if there is only one of them
 
         output_fields:
             ['first_name', 'last_name']
@@ -46,20 +60,22 @@ def split_name(input_data, input_section, output_fields):
         Code:
             import pandas as pd
             from transform_functions.public.name import split_name
-            input_data = pd.DataFrame({ 'name': ['John Doe', 'Jane H. Smith', 'Johnson, Robert A.'] })
-            input_fields = ['name']
+            input_data = {"data": {"input_1": {"csv": pd.DataFrame({ 'name': ['John Doe', 'Jane H. Smith', 'Johnson, Robert A.'] })}}, "metadata": {}}
+            input_section = {"fields": ['name']}
             output_fields = ['first_name', 'last_name']
-            split_name(input_data, input_fields, output_fields)
+            split_name(input_data, input_section, output_fields)
 
         Returns:
             output_data:
                 first_name     last_name
                 John           Doe
-                Jane           Smith
-                Robert         Johnson
+                Jane H.        Smith
+                Robert A.      Johnson
     """
-    NEEDS_RENEWAL
-    input_section = check_data_source_and_entry(input_data, input_section)
+    # ensure consistency of input data
+    existing_data, existing_metadata = split_data_and_metadata(verify_data(input_data))
+
+    input_section = check_data_source_and_entry(existing_data, input_section)
     if not input_section:
         print("Exiting...")
         sys.exit(1)
@@ -72,29 +88,24 @@ def split_name(input_data, input_section, output_fields):
         raise Exception(f"split_name() requires exactly one input field: name -- however, this was given: {input_fields}")
     if len(output_fields) != 2:
         raise Exception(f"split_name() requires exactly two output fields: first_name and last_name -- however, this was given: {output_fields}")
-    output_data = pd.DataFrame()
-    first_names = []
-    last_names = []
-    for _, row in input_data.get(data_source).get(data_entry).iterrows():
-        # if name is "last_name, first_name"
-        if ',' in row[input_fields[0]]:
-            last_name, first_name = [part.strip() for part in row[input_fields[0]].split(',', 1)]
-        # if name is "first_name last_name"
-        elif ' ' in row[input_fields[0]]:
-            first_name, last_name = [part.strip() for part in row[input_fields[0]].rsplit(' ', 1)]
-        # if name is just "first_name"
-        else:
-            first_name = row[input_fields[0]]
-            last_name = ''
-        first_names.append(first_name.strip())
-        last_names.append(last_name.strip())
-    output_data[output_fields[0]] = first_names
-    output_data[output_fields[1]] = last_names
+    # the names are split with plain python string operations in a list comprehension, which is faster than
+    # both iterrows() and the pandas .str accessor for this kind of short strings
+    # missing names are treated as empty strings
+    names = existing_data.get(data_source).get(data_entry)[input_fields[0]].fillna('').astype(str)
+    # names are often repeated (in customer lists etc.), so each unique name is split only once,
+    # and the results are mapped back to all rows with the codes from factorize()
+    name_codes, unique_names = pd.factorize(names)
+    first_and_last_names = [split_one_name(name) for name in unique_names.tolist()]
+    first_names = pd.Index([first_name for first_name, _ in first_and_last_names], dtype=names.dtype).take(name_codes)
+    last_names = pd.Index([last_name for _, last_name in first_and_last_names], dtype=names.dtype).take(name_codes)
+
+    # build the output dataframe in one go (keeping the index of the input data)
+    output_data = pd.DataFrame({output_fields[0]: first_names, output_fields[1]: last_names}, index=names.index)
 
     metadata = {}
-    return structure_dataframe(output_data, input_data), metadata
+    return structure_dataframe(output_data, {}, input_data), metadata
 
-def combine_name_to_first_last(input_data, input_fields, output_fields):
+def combine_name_to_first_last(input_data, input_section, output_fields):
     """
     Combine First Name and Last Name Fields into a Single 'Name' Field.
 
@@ -103,12 +114,12 @@ def combine_name_to_first_last(input_data, input_fields, output_fields):
     the field names of the input and output DataFrame.
 
     Args:
-        input_data (pd.DataFrame): The input DataFrame containing the first name and last name columns.
-        input_fields (list): A list containing the names of the input fields: [first_name_field, last_name_field].
+        input_data (dict): The structured data ({"data": ..., "metadata": ...}) containing the first name and last name columns.
+        input_section (dict): The data source, data entry and the names of the input fields: [first_name_field, last_name_field].
         output_fields (list): A list containing the name of the output field: [combined_name_field].
 
     Returns:
-        pd.DataFrame: A DataFrame with a combined 'name' field.
+        The structured data, with a new data source 'combine_name_to_first_last' (data entry 'data') with the combined 'name' field.
 
     Raises:
         Exception: If the length of input_fields is not exactly 2 or the length of
@@ -121,8 +132,12 @@ def combine_name_to_first_last(input_data, input_fields, output_fields):
             | John       | Doe       |
             | Jane       | Smith     |
 
-        input_fields:
-            ['first_name', 'last_name']
+        input_section:
+            {
+                data_source: "split_name",
+                data_entry: "data",
+                fields: ['first_name', 'last_name']
+            }
 
         output_fields:
             ['name']
@@ -130,13 +145,13 @@ def combine_name_to_first_last(input_data, input_fields, output_fields):
         Code:
             import pandas as pd
             from transform_functions.public.name import combine_name_to_first_last
-            input_data = pd.DataFrame({
+            input_data = {"data": {"input_1": {"csv": pd.DataFrame({
                 'first_name': ['John', 'Jane'],
                 'last_name': ['Doe', 'Smith']
-            })
-            input_fields = ['first_name', 'last_name']
+            })}}, "metadata": {}}
+            input_section = {"fields": ['first_name', 'last_name']}
             output_fields = ['name']
-            combine_name_to_first_last(input_data, input_fields, output_fields)
+            combine_name_to_first_last(input_data, input_section, output_fields)
 
         Returns:
             | name         |
@@ -144,8 +159,10 @@ def combine_name_to_first_last(input_data, input_fields, output_fields):
             | John Doe     |
             | Jane Smith   |
     """
-    NEEDS_RENEWAL
-    input_section = check_data_source_and_entry(input_data, input_section)
+    # ensure consistency of input data
+    existing_data, existing_metadata = split_data_and_metadata(verify_data(input_data))
+
+    input_section = check_data_source_and_entry(existing_data, input_section)
     if not input_section:
         print("Exiting...")
         sys.exit(1)
@@ -158,11 +175,10 @@ def combine_name_to_first_last(input_data, input_fields, output_fields):
         raise Exception(f"combine_name() requires exactly two input fields: first_name and last_name -- however, this was given: {input_fields}")
     if len(output_fields) != 1:
         raise Exception(f"combine_name() requires exactly one output field: name -- however, this was given: {output_fields}")
-    output_data = pd.DataFrame()
-    names = []
-    for index, row in input_data.iterrows():
-        full_name = f"{row[input_fields[0]]} {row[input_fields[1]]}"
-        names.append(full_name)
-    output_data[output_fields[0]] = names
+    # the names are combined for all rows at once with str.cat(), missing names are treated as empty strings
+    name_data = existing_data.get(data_source).get(data_entry)
+    names = name_data[input_fields[0]].astype('string').str.cat(name_data[input_fields[1]].astype('string'), sep=' ', na_rep='')
+
+    output_data = pd.DataFrame({output_fields[0]: names})
     metadata = {}
-    return structure_dataframe(output_data, input_data), metadata
+    return structure_dataframe(output_data, {}, input_data), metadata
@@ -1,5 +1,7 @@
+import numpy as np
 import pandas as pd
 import time
+from func.shared import check_data_source_and_entry, verify_data, split_data_and_metadata, structure_dataframe
 
 # we have this data (spaced out for readability, truncated for brevity):
 sample = """cycle ,voltage  ,current,capacity   ,energy     ,time
@@ -29,8 +31,8 @@ df = pd.read_csv(csvStringIO, sep=",", header=0, skipinitialspace=True, names=co
 index_column = 'time'
 pivot_column = 'cycle'
 data_column = 'capacity'
-input_data = {'index': index_column, 'pivot': pivot_column, 'data': data_column}
-pivot(df, input_data, None)
+input_section = {'index_column': index_column, 'pivot_column': pivot_column, 'data_column': data_column}
+pivot({'data': {'input_1': {'csv': df}}, 'metadata': {}}, input_section, None)
 """
 # so the data looks like this:
 """
@@ -43,39 +45,71 @@ pivot(df, input_data, None)
 """
 
 
-def pivot(input_data, input_fields, output_fields):
+def pivot(data, input_section, output_section):
     """
     Pivot a dataframe from long to wide format
 
-    :param input_data: the dataframe to pivot
-    :param input_fields: {
-        "index": the field to use as the index (x-axis)
-        "pivot": the field to use as the pivot (y-axis)
-        "data":  the field to use as the data
+    :param data: the structured data ({"data": ..., "metadata": ...}) with the dataframe to pivot
+    :param input_section: {
+        "data_source": optional if there is only one data source
+        "data_entry": optional if there is only one data entry in the data source
+        "index_column": the field to use as the index (x-axis)
+        "pivot_column": the field to use as the pivot (y-axis)
+        "data_column":  the field to use as the data
+        "float32": optional, if true, float64 data is stored as float32 (with float32 precision, ~7 significant digits)
         }
-    :param output_fields: ignored
-    :return: a new dataframe
+    :param output_section: ignored
+    :return: the structured data with only the pivoted dataframe (all existing data is replaced)
     column names will be index, pivot_1_data, pivot_2_data, etc. where index is the name of the index column, pivot is the name of the pivot column and data is the name of the data column
     For example, if the index column is called 'time', the pivot column is called 'cycle' and the data column is called 'capacity', the columns will be called 'time', 'cycle_1_capacity', 'cycle_2_capacity', etc.
     """
 
+    existing_data, existing_metadata = split_data_and_metadata(verify_data(data))
+
+    # check the validity of the input section of the transform file (this exits the program if it isn't valid)
+    input_section = check_data_source_and_entry(existing_data, input_section)
+    input_data = existing_data.get(input_section['data_source']).get(input_section['data_entry'])
+
     # get the index, pivot and data column names
 
-    index_column = input_fields["index_column"]
-    pivot_column = input_fields["pivot_column"]
-    data_column  = input_fields["data_column"]
+    index_column = input_section["index_column"]
+    pivot_column = input_section["pivot_column"]
+    data_column  = input_section["data_column"]
 
     # pivot the data
-    df = input_data.pivot(index=index_column, columns=pivot_column, values=data_column)
+    df = None
+    # fast path for numeric data without missing index/pivot values (like the cycle data above):
+    # scatter the values directly into a 2D numpy array, with one row per unique index value and one column per unique pivot value (both sorted, like pivot() does)
+    index_values = input_data[index_column]
+    pivot_values = input_data[pivot_column]
+    data_values = input_data[data_column]
+    if all(isinstance(values.dtype, np.dtype) for values in (index_values, pivot_values, data_values)) \
+        and index_values.dtype.kind in 'iuf' and pivot_values.dtype.kind in 'iuf' and data_values.dtype.kind == 'f' \
+        and not index_values.hasnans and not pivot_values.hasnans:
+        unique_index_values, row_positions = np.unique(index_values.to_numpy(), return_inverse=True)
+        unique_pivot_values, column_positions = np.unique(pivot_values.to_numpy(), return_inverse=True)
+        # each index/pivot combination must only occur once, otherwise pivot() is used, which reports the duplicates
+        if np.unique(row_positions * len(unique_pivot_values) + column_positions).size == len(data_values):
+            pivoted_values = np.full((len(unique_index_values), len(unique_pivot_values)), np.nan, dtype=data_values.dtype)
+            pivoted_values[row_positions, column_positions] = data_values.to_numpy()
+            df = pd.DataFrame(pivoted_values, index=pd.Index(unique_index_values, name=index_column), columns=unique_pivot_values)
+    if df is None:
+        df = input_data.pivot(index=index_column, columns=pivot_column, values=data_column)
+
+    # optionally store the data as float32 instead of float64 (the index column is not affected)
+    downcast_to_float32 = bool(input_section.get("float32")) and (df.dtypes == 'float64').all()
+    if downcast_to_float32:
+        df = df.astype('float32')
 
     # rename the columns
-    df.columns = [f'{pivot_column} [] {data_column}'.replace("[]", "{}").format(col) for col in df.columns]
+    df.columns = [f'{pivot_column} {col} {data_column}' for col in df.columns]
 
     # flatten the header so the index column is a column again
-    df = df.reset_index()
+    # (inserted in place and replaced by a range index, instead of reset_index(), which copies the whole dataframe)
+    df.insert(0, index_column, df.index)
+    df.index = pd.RangeIndex(len(df))
 
-    # instruct parent to delete all existing data in the output table before writing the new data returned from this function
+    # all existing data is replaced by the pivoted data (by passing {} as existing data to structure_dataframe)
     # this is required as the output table is a pivot of the input table, so the output table will have a different number of rows and columns each time this function is run
-    metadata = {"clear_input_data": True} 
-
-    return df, metadata
+    metadata = {} # temporary, until metadata is in a separate key in data
+    return structure_dataframe(df, {}, {}), metadata
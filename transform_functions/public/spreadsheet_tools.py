@@ -20,7 +20,8 @@ def extract_single_sheet(input_data, input_section, output_section):
     # check if columns are specified in input fields
     if input_fields:
         # check if specified columns exist in the sheet
-        missing_columns = [col for col in input_fields if col not in new_data.columns]
+        # (set difference on the column index, keeping the order of input_fields)
+        missing_columns = pd.Index(input_fields).difference(new_data.columns, sort=False).tolist()
         if len(missing_columns) > 0:
             print(f"The following columns were specified in the transformations section of the transform file:")
             print(f"  {input_fields}")